@@ -0,0 +1,200 @@
+from functools import wraps
+
+from django.http import JsonResponse, Http404
+from django.views.decorators.http import require_GET
+from .models import Project, Task
+
+# Поля, які можна запитати через ?fields=
+PROJECT_FIELDS = ('id', 'name', 'created_at')
+TASK_FIELDS = ('id', 'title', 'description', 'status', 'project_id', 'parent_task_id',
+               'created_at', 'updated_at', 'version')
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 5000
+MAX_SUBTREE_TASKS = MAX_PAGE_SIZE
+# Вкладеність обмежена, щоб JSON-енкодер не впирався в ліміт рекурсії
+MAX_SUBTREE_DEPTH = 100
+
+
+class ApiError(Exception):
+    pass
+
+
+def parse_fields(request, allowed, param='fields'):
+    """Повертає список полів з ?fields=, id завжди включається (потрібен для курсора)."""
+    raw = request.GET.get(param)
+    if not raw:
+        return list(allowed)
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ApiError(f"Невідомі поля: {', '.join(unknown)}")
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    return fields
+
+
+def parse_int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError(f"Параметр '{name}' має бути цілим числом.")
+
+
+def parse_ids(request):
+    raw = request.GET.get('ids')
+    if not raw:
+        return None
+    ids = [parse_int(value, 'ids') for value in raw.split(',') if value.strip()]
+    if len(ids) > MAX_PAGE_SIZE:
+        raise ApiError(f"Можна запитати не більше {MAX_PAGE_SIZE} id за раз.")
+    return ids
+
+
+def paginate(request, queryset):
+    """
+    Курсорна пагінація за id: WHERE id > cursor ORDER BY id LIMIT n+1.
+    Не залежить від OFFSET, тому вартість сторінки не росте з її номером.
+    """
+    limit = parse_int(request.GET.get('limit', DEFAULT_PAGE_SIZE), 'limit')
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ApiError(f"Параметр 'limit' має бути від 1 до {MAX_PAGE_SIZE}.")
+    cursor = request.GET.get('cursor')
+    if cursor:
+        queryset = queryset.filter(id__gt=parse_int(cursor, 'cursor'))
+
+    rows = list(queryset.order_by('id')[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = str(rows[-1]['id'])
+    return rows, next_cursor
+
+
+def build_subtrees(project_ids, fields):
+    """
+    Завантажує завдання всіх переданих проєктів одним запитом і складає дерева в пам'яті.
+    Повертає словник {project_id: [кореневі завдання з вкладеними 'subtasks']}.
+    Завдання, чий батько належить іншому проєкту, а також недосяжні від коренів
+    (цикл у parent_task) додаються як корені свого проєкту.
+    """
+    query_fields = set(fields) | {'id', 'project_id', 'parent_task_id'}
+    rows = list(
+        Task.objects.filter(project_id__in=project_ids)
+        .order_by('created_at', 'id')
+        .values(*query_fields)[:MAX_SUBTREE_TASKS + 1]
+    )
+    if len(rows) > MAX_SUBTREE_TASKS:
+        raise ApiError(
+            f"Дерево містить понад {MAX_SUBTREE_TASKS} завдань. "
+            f"Використовуйте api/tasks/?project=<id> з курсорною пагінацією."
+        )
+
+    nodes = {}
+    project_of = {}
+    children = {}
+    for row in rows:
+        node = {name: row[name] for name in fields}
+        node['subtasks'] = []
+        nodes[row['id']] = node
+        project_of[row['id']] = row['project_id']
+        children.setdefault((row['project_id'], row['parent_task_id']), []).append(row['id'])
+
+    trees = {project_id: [] for project_id in project_ids}
+    attached = set()
+
+    def attach(root_id, project_id):
+        trees[project_id].append(nodes[root_id])
+        attached.add(root_id)
+        stack = [(root_id, 1)]
+        while stack:
+            node_id, depth = stack.pop()
+            if depth > MAX_SUBTREE_DEPTH:
+                raise ApiError(f"Глибина дерева завдань перевищує {MAX_SUBTREE_DEPTH}.")
+            for child_id in children.get((project_id, node_id), ()):
+                if child_id in attached:
+                    continue
+                attached.add(child_id)
+                nodes[node_id]['subtasks'].append(nodes[child_id])
+                stack.append((child_id, depth + 1))
+
+    for row in rows:
+        if project_of.get(row['parent_task_id']) != row['project_id']:
+            attach(row['id'], row['project_id'])
+    for row in rows:
+        if row['id'] not in attached:
+            attach(row['id'], row['project_id'])
+    return trees
+
+
+def parse_include(request):
+    """Повертає True для ?include=subtree; інші значення вважаються помилкою."""
+    include = request.GET.get('include')
+    if not include:
+        return False
+    if include != 'subtree':
+        raise ApiError(f"Невідоме значення include: {include}")
+    return True
+
+
+def api_view(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        except Http404 as e:
+            return JsonResponse({'error': str(e)}, status=404)
+    return wrapper
+
+
+@require_GET
+@api_view
+def project_list_api(request):
+    fields = parse_fields(request, PROJECT_FIELDS)
+    queryset = Project.objects.all()
+    ids = parse_ids(request)
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+
+    projects, next_cursor = paginate(request, queryset.values(*fields))
+
+    if parse_include(request):
+        task_fields = parse_fields(request, TASK_FIELDS, param='task_fields')
+        trees = build_subtrees([project['id'] for project in projects], task_fields)
+        for project in projects:
+            project['tasks'] = trees[project['id']]
+
+    return JsonResponse({'results': projects, 'next_cursor': next_cursor})
+
+
+@require_GET
+@api_view
+def project_detail_api(request, project_id):
+    fields = parse_fields(request, PROJECT_FIELDS)
+    project = Project.objects.filter(id=project_id).values(*fields).first()
+    if project is None:
+        raise Http404("Проєкт не знайдено.")
+
+    if parse_include(request):
+        task_fields = parse_fields(request, TASK_FIELDS, param='task_fields')
+        project['tasks'] = build_subtrees([project['id']], task_fields)[project['id']]
+
+    return JsonResponse(project)
+
+
+@require_GET
+@api_view
+def task_list_api(request):
+    fields = parse_fields(request, TASK_FIELDS)
+    queryset = Task.objects.all()
+    ids = parse_ids(request)
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+    project_id = request.GET.get('project')
+    if project_id:
+        queryset = queryset.filter(project_id=parse_int(project_id, 'project'))
+
+    tasks, next_cursor = paginate(request, queryset.values(*fields))
+    return JsonResponse({'results': tasks, 'next_cursor': next_cursor})
@@ -25,4 +25,28 @@ class TaskForm(forms.ModelForm):
             'title': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Введіть назву завдання'}),
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3, 'placeholder': 'Додайте опис'}),
             'status': forms.Select(attrs={'class': 'form-select'}),
-        }
\ No newline at end of file
+        }
+
+class TaskUpdateForm(forms.Form):
+    """Часткове оновлення завдання: змінюються лише поля, передані у запиті."""
+    UPDATABLE_FIELDS = ('title', 'description', 'status')
+
+    version = forms.IntegerField(min_value=0)
+    title = forms.CharField(max_length=255, required=False)
+    description = forms.CharField(required=False, empty_value=None)
+    status = forms.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+
+    def clean_title(self):
+        title = self.cleaned_data['title']
+        if 'title' in self.data and not title:
+            raise forms.ValidationError('Назва завдання не може бути порожньою.')
+        return title
+
+    def clean_status(self):
+        status = self.cleaned_data['status']
+        if 'status' in self.data and not status:
+            raise forms.ValidationError('Оберіть статус.')
+        return status
+
+    def get_changes(self):
+        return {name: self.cleaned_data[name] for name in self.UPDATABLE_FIELDS if name in self.data}
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import DEFERRED, F
 from django.contrib.auth.models import User # Якщо будеш використовувати систему користувачів Django
 
 # Модель для Проєктів
@@ -47,10 +48,52 @@ class Task(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата створення")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата оновлення")
+    # Лічильник версій для оптимістичного блокування: збільшується при кожному записі
+    version = models.PositiveIntegerField(default=0, editable=False, verbose_name="Версія")
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        incremented = (
+            not self._state.adding
+            and not kwargs.get('force_insert')
+            and (update_fields is None or len(update_fields) > 0)
+        )
+        if not incremented:
+            return super().save(*args, **kwargs)
+
+        previous_version = self.__dict__.get('version', DEFERRED)
+        self._version_before_save = previous_version
+        self.version = F('version') + 1
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'version'}
+        try:
+            super().save(*args, **kwargs)
+        except Exception:
+            if previous_version is DEFERRED:
+                del self.__dict__['version']
+            else:
+                self.version = previous_version
+            raise
+        finally:
+            del self._version_before_save
+        if isinstance(self.version, int):
+            # Рядка не було і Django виконав INSERT з явним значенням версії
+            return
+        # Нове значення версії відоме лише БД, тому поле стає відкладеним:
+        # перше звернення до task.version після save() зробить один SELECT.
+        del self.__dict__['version']
+
+    def _do_update(self, *args, **kwargs):
+        updated = super()._do_update(*args, **kwargs)
+        if not updated and hasattr(self, '_version_before_save'):
+            # UPDATE не знайшов рядка, далі буде INSERT, де F() неприпустимий
+            previous_version = self._version_before_save
+            self.version = 1 if previous_version is DEFERRED else previous_version + 1
+        return updated
+
     class Meta:
         verbose_name = "Завдання"
         verbose_name_plural = "Завдання"
@@ -1,46 +1,3 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from .models import Task
-
-previous_task_instances = {}
-
-@receiver(post_save, sender=Task)
-def capture_previous_instance(sender, instance, **kwargs):
-
-    try:
-        previous_task_instances[instance.pk] = Task.objects.get(pk=instance.pk)
-    except Task.DoesNotExist:
-        previous_task_instances[instance.pk] = None
-
-
-@receiver(post_save, sender=Task)
-def notify_status_change(sender, instance, created, **kwargs):
-
-    if not created:
-        try:
-
-            db_instance_before_save = Task.objects.get(pk=instance.pk)
-
-            if hasattr(instance, '_previous_status') and instance._previous_status != instance.status:
-                print(f"--- Сповіщення (Сигнал Observer) ---")
-                print(f"Статус завдання '{instance.title}' (ID: {instance.pk}) було змінено.")
-                print(f"Попередній статус: {instance._previous_status}")
-                print(f"Новий статус: {instance.status}")
-                print(f"Проєкт: {instance.project.name}")
-
-                print(f"------------------------------------")
-            elif created:
-                 print(f"--- Сповіщення (Сигнал Observer) ---")
-                 print(f"Створено нове завдання '{instance.title}' (ID: {instance.pk}) зі статусом '{instance.status}'.")
-                 print(f"Проєкт: {instance.project.name}")
-                 print(f"------------------------------------")
-
-
-        except Task.DoesNotExist:
-            pass
-
-
-
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from .models import Task
@@ -49,7 +6,10 @@ from django.conf import settings
 
 @receiver(pre_save, sender=Task)
 def store_previous_status(sender, instance, **kwargs):
-    if instance.pk:
+    if '_versioned_previous_status' in instance.__dict__:
+        # Статус, прочитаний TaskService.update_task_fields; UPDATE захищений умовою WHERE version=?
+        instance._previous_status = instance.__dict__.pop('_versioned_previous_status')
+    elif instance.pk:
         try:
             previous_instance = Task.objects.get(pk=instance.pk)
             instance._previous_status = previous_instance.status
@@ -1,8 +1,12 @@
+from unittest import mock
 from django.test import TestCase, Client
 from django.urls import reverse
 from .models import Project, Task
 from django.core import mail
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, transaction, IntegrityError
+from django.db.models.signals import pre_save
 
 class ProjectModelTest(TestCase):
     def test_project_creation(self):
@@ -121,4 +125,242 @@ class TaskSignalWithLocMemTest(TestCase):
         task.save()
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].subject, 'Зміна статусу завдання: "Signal LocMem Status Change"')
-        self.assertIn("Новий статус: Completed", mail.outbox[0].body)
\ No newline at end of file
+        self.assertIn("Новий статус: Completed", mail.outbox[0].body)
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class TaskUpdateViewTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.project = Project.objects.create(name="Project for Update View")
+        self.task = Task.objects.create(title="Task to Update", project=self.project, status="New")
+        self.update_url = reverse('update_task', args=[self.task.id])
+        mail.outbox = []
+
+    def test_update_status_with_current_version(self):
+        """Тестуємо оновлення статусу з актуальною версією: один SELECT та один UPDATE."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.update_url, {'version': 0, 'status': 'InProgress'})
+        # SAVEPOINT/RELEASE від transaction.atomic() не рахуємо
+        statements = [q['sql'].split()[0] for q in queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertEqual(statements, ['SELECT', 'UPDATE'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['version'], 1)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'InProgress')
+        self.assertEqual(self.task.version, 1)
+        self.assertEqual(self.task.title, 'Task to Update')
+
+    def test_update_status_sends_signal_with_previous_status(self):
+        """Тестуємо, що сигнал бачить попередній та новий статус."""
+        self.client.post(self.update_url, {'version': 0, 'status': 'Completed'})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Попередній статус: New", mail.outbox[0].body)
+        self.assertIn("Новий статус: Completed", mail.outbox[0].body)
+
+    def test_update_with_stale_version_returns_conflict(self):
+        """Тестуємо, що застаріла версія повертає 409 і не перезаписує зміни."""
+        self.client.post(self.update_url, {'version': 0, 'title': 'First Editor'})
+        response = self.client.post(self.update_url, {'version': 0, 'title': 'Second Editor'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['current_version'], 1)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'First Editor')
+
+    def test_save_increments_version(self):
+        """Тестуємо, що звичайний save() також збільшує версію."""
+        self.task.status = 'Completed'
+        self.task.save()
+        self.assertEqual(self.task.version, 1)
+        response = self.client.post(self.update_url, {'version': 0, 'status': 'New'})
+        self.assertEqual(response.status_code, 409)
+
+    def test_refresh_then_save_reports_status_change(self):
+        """Тестуємо, що після refresh_from_db() звичайний save() бачить актуальний попередній статус."""
+        self.client.post(self.update_url, {'version': 0, 'status': 'InProgress'})
+        mail.outbox = []
+        self.task.refresh_from_db()
+        self.task.status = 'New'
+        self.task.save()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Попередній статус: InProgress", mail.outbox[0].body)
+
+    def test_stale_instance_save_does_not_report_false_change(self):
+        """Тестуємо, що застаріла копія не надсилає хибне сповіщення про зміну статусу."""
+        Task.objects.filter(id=self.task.id).update(status='Completed')
+        self.task.status = 'Completed'
+        self.task.save()
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_failed_save_restores_version(self):
+        """Тестуємо, що при помилці save() у version не залишається F()-вираз."""
+        self.task.title = None
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.task.save()
+        self.assertEqual(self.task.version, 0)
+
+    def test_concurrent_write_between_read_and_update(self):
+        """Тестуємо конфлікт, коли рядок змінюється між читанням і умовним UPDATE."""
+        def concurrent_write(sender, instance, **kwargs):
+            Task.objects.filter(id=instance.id).update(version=5)
+
+        pre_save.connect(concurrent_write, sender=Task)
+        try:
+            response = self.client.post(self.update_url, {'version': 0, 'status': 'Completed'})
+        finally:
+            pre_save.disconnect(concurrent_write, sender=Task)
+        self.assertEqual(response.status_code, 409)
+        # Запис "іншого процесу" зроблено в обробнику pre_save, тому він відкочується разом з транзакцією
+        self.task.refresh_from_db()
+        self.assertEqual(response.json()['current_version'], self.task.version)
+        self.assertEqual(self.task.status, 'New')
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_update_with_csrf_token_from_project_page(self):
+        """Тестуємо, що сторінка проєкту видає CSRF-токен, з яким оновлення проходить."""
+        client = Client(enforce_csrf_checks=True)
+        self.assertEqual(client.post(self.update_url, {'version': 0, 'status': 'Completed'}).status_code, 403)
+
+        page = client.get(reverse('project_detail', args=[self.project.id]))
+        self.assertContains(page, self.update_url)
+        token = page.context['csrf_token']
+        response = client.post(self.update_url, {'version': 0, 'status': 'Completed', 'csrfmiddlewaretoken': token})
+        self.assertEqual(response.status_code, 200)
+
+    def test_save_reinserts_deleted_row(self):
+        """Тестуємо, що save() завантаженого завдання після видалення рядка знову його вставляє."""
+        task = Task.objects.get(id=self.task.id)
+        Task.objects.filter(id=task.id).delete()
+        task.save()
+        self.assertEqual(task.version, 1)
+        self.assertTrue(Task.objects.filter(id=task.id, version=1).exists())
+
+    def test_force_insert_on_loaded_instance(self):
+        """Тестуємо save(force_insert=True) для завантаженого завдання."""
+        task = Task.objects.get(id=self.task.id)
+        task.pk = None
+        task.save(force_insert=True)
+        self.assertEqual(Task.objects.get(id=task.id).version, 0)
+
+    def test_update_missing_task_returns_json_404(self):
+        """Тестуємо, що для неіснуючого завдання повертається JSON 404."""
+        response = self.client.post(reverse('update_task', args=[9999]), {'version': 0, 'status': 'New'})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+    def test_empty_description_is_not_a_change(self):
+        """Тестуємо, що порожній опис зберігається як NULL і не збільшує версію."""
+        response = self.client.post(self.update_url, {'version': 0, 'description': ''})
+        self.assertEqual(response.json()['version'], 0)
+        self.task.refresh_from_db()
+        self.assertIsNone(self.task.description)
+
+
+class ApiViewsTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.project1 = Project.objects.create(name="API Project One")
+        self.project2 = Project.objects.create(name="API Project Two")
+        self.root = Task.objects.create(title="Root Task", project=self.project1)
+        self.child = Task.objects.create(title="Child Task", project=self.project1, parent_task=self.root)
+        self.other = Task.objects.create(title="Other Task", project=self.project2)
+
+    def test_task_batch_fetch_with_sparse_fields(self):
+        """Тестуємо вибірку завдань за списком id з обмеженим набором полів."""
+        response = self.client.get(reverse('api_task_list'), {
+            'ids': f'{self.root.id},{self.other.id}',
+            'fields': 'title,status',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [
+            {'id': self.root.id, 'title': 'Root Task', 'status': 'New'},
+            {'id': self.other.id, 'title': 'Other Task', 'status': 'New'},
+        ])
+
+    def test_task_cursor_pagination(self):
+        """Тестуємо курсорну пагінацію списку завдань."""
+        url = reverse('api_task_list')
+        first_page = self.client.get(url, {'limit': 2, 'fields': 'id'}).json()
+        self.assertEqual([t['id'] for t in first_page['results']], [self.root.id, self.child.id])
+        self.assertEqual(first_page['next_cursor'], str(self.child.id))
+
+        second_page = self.client.get(url, {'limit': 2, 'fields': 'id', 'cursor': first_page['next_cursor']}).json()
+        self.assertEqual([t['id'] for t in second_page['results']], [self.other.id])
+        self.assertIsNone(second_page['next_cursor'])
+
+    def test_unknown_field_returns_bad_request(self):
+        """Тестуємо, що невідоме поле у fields= повертає 400."""
+        response = self.client.get(reverse('api_task_list'), {'fields': 'title,secret'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_project_subtree_single_task_query(self):
+        """Тестуємо дерево завдань проєкту: один запит за проєктом і один за завданнями."""
+        url = reverse('api_project_detail', args=[self.project1.id])
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'include': 'subtree', 'task_fields': 'title'})
+        data = response.json()
+        self.assertEqual(data['name'], 'API Project One')
+        self.assertEqual(len(data['tasks']), 1)
+        self.assertEqual(data['tasks'][0]['title'], 'Root Task')
+        self.assertEqual(data['tasks'][0]['subtasks'][0]['title'], 'Child Task')
+
+    def test_project_list_with_subtrees(self):
+        """Тестуємо список проєктів з деревами завдань."""
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('api_project_list'), {'include': 'subtree'})
+        results = response.json()['results']
+        self.assertEqual([p['name'] for p in results], ['API Project One', 'API Project Two'])
+        self.assertEqual(results[1]['tasks'][0]['title'], 'Other Task')
+
+    def test_project_detail_not_found(self):
+        """Тестуємо 404 для неіснуючого проєкту."""
+        response = self.client.get(reverse('api_project_detail', args=[9999]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json(), {'error': 'Проєкт не знайдено.'})
+
+    def test_subtree_keeps_tasks_in_parent_cycle(self):
+        """Тестуємо, що завдання з циклом у parent_task не зникають з дерева."""
+        first = Task.objects.create(title="Cycle A", project=self.project2)
+        second = Task.objects.create(title="Cycle B", project=self.project2, parent_task=first)
+        Task.objects.filter(id=first.id).update(parent_task=second)
+
+        url = reverse('api_project_detail', args=[self.project2.id])
+        tasks = self.client.get(url, {'include': 'subtree', 'task_fields': 'title'}).json()['tasks']
+        self.assertEqual([t['title'] for t in tasks], ['Other Task', 'Cycle A'])
+        self.assertEqual(tasks[1]['subtasks'][0]['title'], 'Cycle B')
+
+    def test_subtree_cross_project_parent_is_root(self):
+        """Тестуємо, що завдання з батьком з іншого проєкту є коренем незалежно від сторінки."""
+        Task.objects.create(title="Cross Child", project=self.project2, parent_task=self.root)
+
+        detail = self.client.get(
+            reverse('api_project_detail', args=[self.project2.id]), {'include': 'subtree', 'task_fields': 'title'}
+        ).json()
+        self.assertEqual([t['title'] for t in detail['tasks']], ['Other Task', 'Cross Child'])
+
+        results = self.client.get(
+            reverse('api_project_list'), {'include': 'subtree', 'task_fields': 'title'}
+        ).json()['results']
+        self.assertEqual(results[1]['tasks'], detail['tasks'])
+        self.assertEqual([t['title'] for t in results[0]['tasks'][0]['subtasks']], ['Child Task'])
+
+    def test_unknown_include_returns_bad_request(self):
+        """Тестуємо 400 для невідомого значення include=."""
+        response = self.client.get(reverse('api_project_list'), {'include': 'subtrees'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('api_project_detail', args=[self.project1.id]), {'include': 'subtrees'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_subtree_too_many_tasks_returns_bad_request(self):
+        """Тестуємо 400, коли дерево перевищує ліміт кількості завдань."""
+        url = reverse('api_project_detail', args=[self.project1.id])
+        with mock.patch('tasks.api.MAX_SUBTREE_TASKS', 1):
+            response = self.client.get(url, {'include': 'subtree'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_subtree_too_deep_returns_bad_request(self):
+        """Тестуємо 400, коли дерево перевищує ліміт вкладеності."""
+        url = reverse('api_project_detail', args=[self.project1.id])
+        with mock.patch('tasks.api.MAX_SUBTREE_DEPTH', 1):
+            response = self.client.get(url, {'include': 'subtree'})
+        self.assertEqual(response.status_code, 400)
@@ -1,10 +1,14 @@
 from django.urls import path
-from . import views
+from . import views, api
 
 urlpatterns = [
     path('', views.project_list, name='project_list'),
     path('project/new/', views.create_project, name='create_project'),
     path('project/<int:project_id>/', views.project_detail, name='project_detail'),
     path('project/<int:project_id>/task/new/', views.create_task_with_facade, name='create_task_with_facade'),
+    path('task/<int:task_id>/update/', views.update_task, name='update_task'),
+    path('api/projects/', api.project_list_api, name='api_project_list'),
+    path('api/projects/<int:project_id>/', api.project_detail_api, name='api_project_detail'),
+    path('api/tasks/', api.task_list_api, name='api_task_list'),
 
 ]
\ No newline at end of file
@@ -1,6 +1,12 @@
+from django.db import router, transaction
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save
+from django.http import JsonResponse, Http404
 from django.shortcuts import render, redirect, get_object_or_404
+from django.utils import timezone
+from django.views.decorators.http import require_POST
 from .models import Project, Task
-from .forms import ProjectForm, TaskForm
+from .forms import ProjectForm, TaskForm, TaskUpdateForm
 
 
 def project_list(request):
@@ -39,6 +45,16 @@ def create_task(request, project_id):
     return render(request, 'tasks/task_form.html', {'form': form, 'project': project, 'title': 'Створити завдання'})
 
 
+class TaskVersionConflict(Exception):
+    """
+    Версія завдання в БД не збігається з очікуваною.
+    current_version дорівнює None, якщо завдання встигли видалити.
+    """
+    def __init__(self, current_version=None):
+        super().__init__("Завдання було змінено іншим користувачем.")
+        self.current_version = current_version
+
+
 class TaskService:
     def create_task_in_project(self, title, description, status, project_id, parent_task_id=None):
         project = get_object_or_404(Project, id=project_id)
@@ -56,6 +72,49 @@ class TaskService:
 
         return task
 
+    def update_task_fields(self, task_id, expected_version, changes):
+        """
+        Оновлює лише змінені поля одним UPDATE ... WHERE id=? AND version=?.
+        Якщо версія в БД вже інша, кидає TaskVersionConflict.
+        """
+        task = get_object_or_404(Task.objects.select_related('project'), id=task_id)
+        if task.version != expected_version:
+            raise TaskVersionConflict(task.version)
+
+        changed = {name: value for name, value in changes.items() if getattr(task, name) != value}
+        if not changed:
+            return task
+
+        using = router.db_for_write(Task, instance=task)
+        update_fields = frozenset(changed) | {'updated_at', 'version'}
+        now = timezone.now()
+        previous_status = task.status
+        for name, value in changed.items():
+            setattr(task, name, value)
+        task.updated_at = now
+
+        with transaction.atomic(using=using):
+            # Попередній статус передається сигналу напряму, без додаткового SELECT:
+            # він прочитаний вище, а UPDATE нижче спрацює лише для тієї ж версії рядка
+            task._versioned_previous_status = previous_status
+            pre_save.send(sender=Task, instance=task, raw=False, using=using, update_fields=update_fields)
+            updated = Task.objects.using(using).filter(id=task.id, version=expected_version).update(
+                updated_at=now,
+                version=F('version') + 1,
+                **changed
+            )
+            if not updated:
+                # Відкочуємо все, що записали обробники pre_save
+                transaction.set_rollback(True, using=using)
+
+        if not updated:
+            current_version = Task.objects.using(using).filter(id=task.id).values_list('version', flat=True).first()
+            raise TaskVersionConflict(current_version)
+
+        task.version = expected_version + 1
+        post_save.send(sender=Task, instance=task, created=False, raw=False, using=using, update_fields=update_fields)
+        return task
+
 
 class TaskManagerFacade:
     def __init__(self):
@@ -87,4 +146,27 @@ def create_task_with_facade(request, project_id):
     else:
         form = TaskForm()
     return render(request, 'tasks/task_form.html',
-                  {'form': form, 'project': project, 'title': 'Створити завдання (Facade)'})
\ No newline at end of file
+                  {'form': form, 'project': project, 'title': 'Створити завдання (Facade)'})
+
+
+@require_POST
+def update_task(request, task_id):
+    form = TaskUpdateForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    try:
+        task = TaskService().update_task_fields(task_id, form.cleaned_data['version'], form.get_changes())
+    except TaskVersionConflict as e:
+        return JsonResponse({'error': str(e), 'current_version': e.current_version}, status=409)
+    except Http404:
+        return JsonResponse({'error': 'Завдання не знайдено.'}, status=404)
+
+    return JsonResponse({
+        'id': task.id,
+        'title': task.title,
+        'description': task.description,
+        'status': task.status,
+        'version': task.version,
+        'updated_at': task.updated_at.isoformat(),
+    })